@@ -3,9 +3,13 @@
 # Streamlit Web Application
 # ============================================================================
 
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
@@ -33,27 +37,434 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+SEGMENT_CARD = """
+    <div style='padding: 1rem; background-color: {color}22; 
+                border-radius: 0.5rem; border-left: 4px solid {color}'>
+        <h3 style='color: {color}; margin: 0;'>{segment}</h3>
+        <p style='font-size: 2rem; margin: 0.5rem 0;'>{count}</p>
+        <p style='margin: 0;'>customers</p>
+        <p style='font-size: 1.2rem; margin: 0.5rem 0;'>${revenue:,.0f}</p>
+        <p style='margin: 0;'>total revenue</p>
+    </div>
+"""
+
 # ============================================================================
 # LOAD DATA
 # ============================================================================
 
+SALES_CSV = 'retail_sales_data.csv'
+RFM_CSV = 'customer_rfm_segments.csv'
+ASSOCIATIONS_CSV = 'product_associations.csv'
+FORECAST_CSV = 'sales_forecast.csv'
+
+SEGMENTS = ['Champions', 'Loyal', 'Potential', 'At Risk']
+SEGMENT_COLORS = ['#2ecc71', '#3498db', '#f39c12', '#e74c3c']
+
+# Low-cardinality text columns load as categoricals so groupbys hash int codes;
+# high-cardinality IDs are Arrow-backed so hashing runs on one byte buffer
+SALES_DTYPES = {
+    'Order_ID': 'string[pyarrow]',
+    'Customer_ID': 'string[pyarrow]',
+    'Segment': 'category',
+    'Region': 'category',
+    'Category': 'category',
+    'Product': 'category'
+}
+RFM_DTYPES = {
+    'Customer_ID': 'string[pyarrow]',
+    'Segment': pd.CategoricalDtype(SEGMENTS)
+}
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+          'July', 'August', 'September', 'October', 'November', 'December']
+
+def data_signature(path):
+    # Cheap cache key for a static CSV - changes only when the file is rewritten
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def parquet_signature(parquet_path):
+    # CSV signature recorded in the Parquet footer when the copy was written
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return metadata.get(b'csv_signature')
+
+def read_table(csv_path, dtype=None, parse_dates=None):
+    # Prefer a Parquet copy next to the CSV; rebuild it whenever the CSV changes
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    csv_sig = repr(data_signature(csv_path)).encode()
+    if parquet_signature(parquet_path) == csv_sig:
+        df = pd.read_parquet(parquet_path)
+        # Parquet metadata does not always round-trip the string storage backend
+        return df.astype(dtype) if dtype else df
+    
+    df = pd.read_csv(csv_path, dtype=dtype, parse_dates=parse_dates)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'csv_signature': csv_sig})
+    
+    # Unique temp name so concurrent writers never publish each other's partial file
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix='.parquet', dir=os.path.dirname(parquet_path) or '.')
+        with os.fdopen(fd, 'wb') as f:
+            pq.write_table(table, f)
+        os.replace(tmp_path, parquet_path)
+        tmp_path = None
+    except OSError:
+        pass  # read-only deployments keep reading the CSV
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+# Each file has its own loader so a page only pays for the data it shows. The
+# file signature is the cache key, so a rewritten CSV reloads together with
+# every aggregation and figure derived from it.
+
 @st.cache_data
-def load_data():
+def load_sales(sig):
     try:
-        sales_df = pd.read_csv('retail_sales_data.csv')
-        sales_df['Order_Date'] = pd.to_datetime(sales_df['Order_Date'])
-        
-        rfm_df = pd.read_csv('customer_rfm_segments.csv')
-        associations_df = pd.read_csv('product_associations.csv')
-        forecast_df = pd.read_csv('sales_forecast.csv')
-        forecast_df['Month'] = pd.to_datetime(forecast_df['Month'])
-        
-        return sales_df, rfm_df, associations_df, forecast_df
+        sales_df = read_table(SALES_CSV, dtype=SALES_DTYPES, parse_dates=['Order_Date'])
+        sales_df['Order_Month'] = sales_df['Order_Date'].dt.to_period('M')
+        sales_df['Month_Name'] = pd.Categorical(sales_df['Order_Date'].dt.month_name(),
+                                                categories=MONTHS, ordered=True)
+        return sales_df
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return None
+
+@st.cache_data
+def load_rfm(sig):
+    try:
+        return read_table(RFM_CSV, dtype=RFM_DTYPES)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return None
+
+@st.cache_data
+def load_associations(sig):
+    try:
+        return read_table(ASSOCIATIONS_CSV)
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        return None, None, None, None
+        return None
+
+@st.cache_data
+def load_forecast(sig):
+    try:
+        return read_table(FORECAST_CSV, parse_dates=['Month'])
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return None
+
+# The sidebar summary needs the sales table on every page
+sales_sig = data_signature(SALES_CSV)
+sales_df = load_sales(sales_sig)
+
+# ============================================================================
+# CACHED AGGREGATIONS
+# ============================================================================
+# DataFrames are passed as underscore arguments so Streamlit skips hashing
+# them; the file signature is the cache key instead. Helpers project the
+# columns they need inside the cached body, so the copy is paid once per miss.
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_monthly(_df, sig):
+    monthly = _df[['Order_Month', 'Sales', 'Profit']].groupby('Order_Month', observed=True).agg({
+        'Sales': 'sum',
+        'Profit': 'sum'
+    }).reset_index()
+    monthly['Order_Date'] = monthly.pop('Order_Month').dt.to_timestamp()
+    return monthly
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_executive(_df, sig):
+    # Project once so the three overview groupbys only touch the columns they use
+    small = _df[['Category', 'Region', 'Sales', 'Profit', 'Order_Month']]
+    category_sales = small.groupby('Category', observed=True)['Sales'].sum().sort_values(ascending=True)
+    region_sales = small.groupby('Region', observed=True)['Sales'].sum()
+    return category_sales, region_sales, agg_monthly(small, sig)
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_monthly_avg_by_name(_df, sig):
+    # Ordered categorical groups come out January..December without a reindex
+    return _df.groupby('Month_Name', observed=True)['Sales'].mean()
+
+def top_k(ser, k=10):
+    # Same result as ser.nlargest(k) (keep='first'): an O(n) partition finds the
+    # k-th largest value, ties at that boundary go to the earliest rows, and
+    # only the k selected values are sorted
+    arr = ser.to_numpy()
+    n = len(arr)
+    if n > k:
+        kth = np.partition(arr, n - k)[n - k]
+        above = np.flatnonzero(arr > kth)
+        ties = np.flatnonzero(arr == kth)[:k - len(above)]
+        idx = np.sort(np.concatenate([above, ties]))
+    else:
+        idx = np.arange(n)
+    # Stable sort on positional order keeps equal values first-in-index
+    return ser.iloc[idx[np.argsort(-arr[idx], kind='stable')]]
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_top_products(_df, sig):
+    return top_k(_df.groupby('Product', observed=True)['Sales'].sum())
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_margin(_df, sig, by):
+    # Sales, profit and margin (%) per Product or Category
+    margin = _df[[by, 'Sales', 'Profit']].groupby(by, observed=True).agg(
+        Sales=('Sales', 'sum'),
+        Profit=('Profit', 'sum')
+    )
+    margin['Margin'] = (margin['Profit'] / margin['Sales']) * 100
+    return margin
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_kpis(_df, sig):
+    return _df['Sales'].sum(), _df['Profit'].sum(), _df['Order_ID'].nunique()
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_segment_stats(_df, sig):
+    return _df.groupby('Segment', observed=True).agg({
+        'Customer_ID': 'count',
+        'Monetary': ['sum', 'mean'],
+        'Frequency': 'mean',
+        'Recency': 'mean'
+    }).round(2)
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_segment_groups(_df, sig):
+    # Single-pass partition shared by the distribution pie and the scatter
+    return dict(list(_df.groupby('Segment', observed=True, sort=False)))
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_segment_revenue(_df, sig):
+    return _df.groupby('Segment', observed=True)['Monetary'].sum().sort_values()
+
+@st.cache_data(ttl=None, show_spinner=False)
+def agg_forecast_mean(_df, sig):
+    return _df['Forecasted_Sales'].mean()
+
+@st.cache_data(ttl=None, show_spinner=False)
+def summary_metrics(_sales_df, _rfm_df, sales_sig, rfm_sig):
+    # Scalars for the Recommendations page, reduced from the shared aggregations
+    monthly_avg = agg_monthly_avg_by_name(_sales_df, sales_sig)
+    category_margin = agg_margin(_sales_df, sales_sig, 'Category')['Margin']
+    best_margin_cat = category_margin.idxmax()
+    return {
+        'last_month_sales': agg_monthly(_sales_df, sales_sig)['Sales'].iat[-1],
+        'seg_counts': {} if _rfm_df is None else _rfm_df['Segment'].value_counts().to_dict(),
+        'best_month': monthly_avg.idxmax(),
+        'worst_month': monthly_avg.idxmin(),
+        'best_margin_cat': best_margin_cat,
+        'best_margin': category_margin.at[best_margin_cat]
+    }
+
+# Bar labels are formatted here once rather than by Plotly's d3-format per render
+def currency_labels(values):
+    return [f"${v:,.0f}" for v in values]
+
+# ============================================================================
+# CACHED FIGURES
+# ============================================================================
+# Figures are shared (not copied) between reruns, so they are built once per
+# data signature and must not be mutated after they are returned.
+
+@st.cache_resource(show_spinner=False)
+def fig_category_sales(_df, sig):
+    category_sales = agg_executive(_df, sig)[0]
+    fig = go.Figure(go.Bar(
+        x=category_sales.to_numpy(dtype=np.float64),
+        y=category_sales.index.to_numpy(),
+        orientation='h',
+        marker_color='steelblue',
+        text=currency_labels(category_sales.to_numpy()),
+        textposition='outside'
+    ))
+    fig.update_layout(height=400, showlegend=False,
+                    xaxis_title="Sales ($)", yaxis_title="")
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def fig_region_sales(_df, sig):
+    region_sales = agg_executive(_df, sig)[1]
+    fig = go.Figure(go.Pie(
+        labels=region_sales.index.to_numpy(),
+        values=region_sales.to_numpy(dtype=np.float64),
+        hole=0.4
+    ))
+    fig.update_layout(height=400)
+    return fig
 
-sales_df, rfm_df, associations_df, forecast_df = load_data()
+@st.cache_resource(show_spinner=False)
+def fig_monthly_trend(_df, sig):
+    monthly = agg_executive(_df, sig)[2]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=monthly['Order_Date'].to_numpy(dtype='datetime64[ms]'),
+        y=monthly['Sales'].to_numpy(dtype=np.float64),
+        name='Sales',
+        line=dict(color='navy', width=3)
+    ))
+    fig.add_trace(go.Scatter(
+        x=monthly['Order_Date'].to_numpy(dtype='datetime64[ms]'),
+        y=monthly['Profit'].to_numpy(dtype=np.float64),
+        name='Profit',
+        line=dict(color='green', width=3)
+    ))
+    fig.update_layout(height=400, hovermode='x unified',
+                     xaxis_title="Month", yaxis_title="Amount ($)")
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def fig_sales_forecast(_sales_df, _forecast_df, sales_sig, forecast_sig):
+    monthly = agg_monthly(_sales_df, sales_sig)
+    
+    fig = go.Figure()
+    
+    # Historical data
+    fig.add_trace(go.Scatter(
+        x=monthly['Order_Date'].to_numpy(dtype='datetime64[ms]'),
+        y=monthly['Sales'].to_numpy(dtype=np.float64),
+        name='Actual Sales',
+        mode='lines+markers',
+        line=dict(color='navy', width=3),
+        marker=dict(size=6)
+    ))
+    
+    # Forecast
+    fig.add_trace(go.Scatter(
+        x=_forecast_df['Month'].to_numpy(dtype='datetime64[ms]'),
+        y=_forecast_df['Forecasted_Sales'].to_numpy(dtype=np.float64),
+        name='Forecasted Sales',
+        mode='lines+markers',
+        line=dict(color='red', width=3, dash='dash'),
+        marker=dict(size=8, symbol='diamond')
+    ))
+    
+    fig.update_layout(
+        height=500,
+        hovermode='x unified',
+        xaxis_title="Month",
+        yaxis_title="Sales ($)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def fig_seasonal(_df, sig):
+    monthly_avg = agg_monthly_avg_by_name(_df, sig)
+    
+    # Highlight best (red) and worst (green) months
+    vals = monthly_avg.to_numpy()
+    vmax, vmin = vals.max(), vals.min()
+    bar_colors = np.where(vals == vmax, '#e74c3c',
+                          np.where(vals == vmin, '#2ecc71', '#3498db')).tolist()
+    
+    fig = go.Figure(go.Bar(
+        x=monthly_avg.index.to_numpy(),
+        y=monthly_avg.to_numpy(dtype=np.float64),
+        marker_color=bar_colors,
+        text=currency_labels(monthly_avg.to_numpy()),
+        textposition='outside'
+    ))
+    fig.update_layout(height=400, showlegend=False,
+                     xaxis_title="Month", yaxis_title="Average Sales ($)")
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def fig_top_products(_df, sig):
+    top_products = agg_top_products(_df, sig)
+    
+    fig = go.Figure(go.Bar(
+        x=top_products.to_numpy(dtype=np.float64),
+        y=top_products.index.to_numpy(),
+        orientation='h',
+        marker_color='coral',
+        text=currency_labels(top_products.to_numpy()),
+        textposition='outside'
+    ))
+    fig.update_layout(height=400, showlegend=False, xaxis_title="Sales ($)")
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def fig_top_margin(_df, sig):
+    product_margin = agg_margin(_df, sig, 'Product')
+    top_margin = top_k(product_margin['Margin'].dropna())
+    
+    fig = go.Figure(go.Bar(
+        x=top_margin.to_numpy(dtype=np.float64),
+        y=top_margin.index.to_numpy(),
+        orientation='h',
+        marker_color='gold',
+        text=[f"{v:.1f}%" for v in top_margin.to_numpy()],
+        textposition='outside'
+    ))
+    fig.update_layout(height=400, showlegend=False, xaxis_title="Profit Margin (%)")
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def fig_segment_distribution(_df, sig):
+    groups = agg_segment_groups(_df, sig)
+    segment_counts = pd.Series(
+        {seg: seg_data.shape[0] for seg, seg_data in groups.items()}
+    ).sort_values(ascending=False)
+    
+    fig = go.Figure(go.Pie(
+        labels=segment_counts.index.to_numpy(),
+        values=segment_counts.to_numpy(),
+        marker_colors=SEGMENT_COLORS[:len(segment_counts)]
+    ))
+    fig.update_layout(height=400)
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def fig_segment_revenue(_df, sig):
+    segment_revenue = agg_segment_revenue(_df, sig)
+    
+    fig = go.Figure(go.Bar(
+        x=segment_revenue.to_numpy(dtype=np.float64),
+        y=segment_revenue.index.to_numpy(),
+        orientation='h',
+        marker_color=SEGMENT_COLORS[:len(segment_revenue)],
+        text=currency_labels(segment_revenue.to_numpy()),
+        textposition='outside'
+    ))
+    fig.update_layout(height=400, showlegend=False, xaxis_title="Revenue ($)")
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def fig_value_matrix(_df, sig):
+    groups = agg_segment_groups(_df, sig)
+    fig = go.Figure()
+    
+    for segment in SEGMENTS:
+        seg_data = groups.get(segment)
+        if seg_data is not None:
+            # WebGL keeps thousands of customers to a single draw call
+            fig.add_trace(go.Scattergl(
+                x=seg_data['Frequency'].to_numpy(),
+                y=seg_data['Monetary'].to_numpy(),
+                mode='markers',
+                name=segment,
+                marker=dict(size=6, opacity=0.5),
+                hovertemplate='Frequency: %{x}<br>Spend: $%{y:,.0f}'
+            ))
+    
+    fig.update_layout(
+        height=500,
+        xaxis_title="Purchase Frequency",
+        yaxis_title="Total Spend ($)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
 
 # ============================================================================
 # HEADER
@@ -83,16 +494,14 @@ if sales_df is not None:
 # PAGE 1: EXECUTIVE OVERVIEW
 # ============================================================================
 
-if page == "Executive Overview":
+def render_executive():
     st.header("Executive Overview")
     
     if sales_df is not None:
         # Key Metrics
         col1, col2, col3, col4 = st.columns(4)
         
-        total_sales = sales_df['Sales'].sum()
-        total_profit = sales_df['Profit'].sum()
-        total_orders = sales_df['Order_ID'].nunique()
+        total_sales, total_profit, total_orders = agg_kpis(sales_df, sales_sig)
         avg_order_value = total_sales / total_orders
         
         col1.metric("Total Revenue", f"${total_sales:,.0f}")
@@ -108,143 +517,61 @@ if page == "Executive Overview":
         
         with col1:
             st.subheader("Sales by Category")
-            category_sales = sales_df.groupby('Category')['Sales'].sum().sort_values(ascending=True)
-            fig = go.Figure(go.Bar(
-                x=category_sales.values,
-                y=category_sales.index,
-                orientation='h',
-                marker_color='steelblue',
-                text=category_sales.values,
-                texttemplate='$%{text:,.0f}',
-                textposition='outside'
-            ))
-            fig.update_layout(height=400, showlegend=False,
-                            xaxis_title="Sales ($)", yaxis_title="")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig_category_sales(sales_df, sales_sig), use_container_width=True)
         
         with col2:
             st.subheader("Regional Performance")
-            region_sales = sales_df.groupby('Region')['Sales'].sum()
-            fig = go.Figure(go.Pie(
-                labels=region_sales.index,
-                values=region_sales.values,
-                hole=0.4
-            ))
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig_region_sales(sales_df, sales_sig), use_container_width=True)
         
         # Monthly Trend
         st.subheader("Monthly Sales Trend")
-        monthly = sales_df.groupby(sales_df['Order_Date'].dt.to_period('M')).agg({
-            'Sales': 'sum',
-            'Profit': 'sum'
-        }).reset_index()
-        monthly['Order_Date'] = monthly['Order_Date'].dt.to_timestamp()
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=monthly['Order_Date'],
-            y=monthly['Sales'],
-            name='Sales',
-            line=dict(color='navy', width=3)
-        ))
-        fig.add_trace(go.Scatter(
-            x=monthly['Order_Date'],
-            y=monthly['Profit'],
-            name='Profit',
-            line=dict(color='green', width=3)
-        ))
-        fig.update_layout(height=400, hovermode='x unified',
-                         xaxis_title="Month", yaxis_title="Amount ($)")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_monthly_trend(sales_df, sales_sig), use_container_width=True)
 
 # ============================================================================
 # PAGE 2: SALES TRENDS & FORECAST
 # ============================================================================
 
-elif page == "Sales Trends & Forecast":
+def render_trends():
     st.header("Sales Trends & Forecasting")
     
+    forecast_sig = data_signature(FORECAST_CSV)
+    forecast_df = load_forecast(forecast_sig)
+    
     if sales_df is not None and forecast_df is not None:
         # Historical + Forecast
         st.subheader("Sales Forecast - Next 3 Months")
         
-        monthly = sales_df.groupby(sales_df['Order_Date'].dt.to_period('M'))['Sales'].sum().reset_index()
-        monthly['Order_Date'] = monthly['Order_Date'].dt.to_timestamp()
-        
-        fig = go.Figure()
-        
-        # Historical data
-        fig.add_trace(go.Scatter(
-            x=monthly['Order_Date'],
-            y=monthly['Sales'],
-            name='Actual Sales',
-            mode='lines+markers',
-            line=dict(color='navy', width=3),
-            marker=dict(size=6)
-        ))
-        
-        # Forecast
-        fig.add_trace(go.Scatter(
-            x=forecast_df['Month'],
-            y=forecast_df['Forecasted_Sales'],
-            name='Forecasted Sales',
-            mode='lines+markers',
-            line=dict(color='red', width=3, dash='dash'),
-            marker=dict(size=8, symbol='diamond')
-        ))
+        monthly = agg_monthly(sales_df, sales_sig)
         
-        fig.update_layout(
-            height=500,
-            hovermode='x unified',
-            xaxis_title="Month",
-            yaxis_title="Sales ($)",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_sales_forecast(sales_df, forecast_df, sales_sig, forecast_sig),
+                        use_container_width=True)
         
         # Forecast Details
         st.subheader("Detailed Forecast")
-        col1, col2, col3 = st.columns(3)
+        cols = st.columns(3)
+        last_actual = monthly['Sales'].iat[-1]
         
-        for i, (idx, row) in enumerate(forecast_df.iterrows()):
-            with [col1, col2, col3][i]:
+        for i, row in enumerate(forecast_df.itertuples(index=False)):
+            with cols[i]:
                 st.metric(
-                    row['Month'].strftime('%B %Y'),
-                    f"${row['Forecasted_Sales']:,.0f}",
-                    f"+{((row['Forecasted_Sales'] / monthly['Sales'].iloc[-1]) - 1) * 100:.1f}%"
+                    row.Month.strftime('%B %Y'),
+                    f"${row.Forecasted_Sales:,.0f}",
+                    f"+{((row.Forecasted_Sales / last_actual) - 1) * 100:.1f}%"
                 )
         
         # Seasonal Analysis
         st.markdown("---")
         st.subheader("Seasonal Patterns")
         
-        sales_df['Month'] = sales_df['Order_Date'].dt.month_name()
-        monthly_avg = sales_df.groupby('Month')['Sales'].mean().reindex([
-            'January', 'February', 'March', 'April', 'May', 'June',
-            'July', 'August', 'September', 'October', 'November', 'December'
-        ])
-        
-        fig = go.Figure(go.Bar(
-            x=monthly_avg.index,
-            y=monthly_avg.values,
-            marker_color=['#e74c3c' if v == monthly_avg.max() else 
-                         '#2ecc71' if v == monthly_avg.min() else '#3498db' 
-                         for v in monthly_avg.values],
-            text=monthly_avg.values,
-            texttemplate='$%{text:,.0f}',
-            textposition='outside'
-        ))
-        fig.update_layout(height=400, showlegend=False,
-                         xaxis_title="Month", yaxis_title="Average Sales ($)")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_seasonal(sales_df, sales_sig), use_container_width=True)
 
 # ============================================================================
 # PAGE 3: PRODUCT ANALYTICS
 # ============================================================================
 
-elif page == "Product Analytics":
+def render_products():
     st.header("Product Analytics & Recommendations")
+    associations_df = load_associations(data_signature(ASSOCIATIONS_CSV))
     
     if sales_df is not None:
         # Top Products
@@ -252,40 +579,11 @@ elif page == "Product Analytics":
         
         with col1:
             st.subheader("Top 10 Best Sellers")
-            top_products = sales_df.groupby('Product')['Sales'].sum().sort_values(ascending=False).head(10)
-            
-            fig = go.Figure(go.Bar(
-                x=top_products.values,
-                y=top_products.index,
-                orientation='h',
-                marker_color='coral',
-                text=top_products.values,
-                texttemplate='$%{text:,.0f}',
-                textposition='outside'
-            ))
-            fig.update_layout(height=400, showlegend=False, xaxis_title="Sales ($)")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig_top_products(sales_df, sales_sig), use_container_width=True)
         
         with col2:
             st.subheader("Profit Margin Analysis")
-            product_margin = sales_df.groupby('Product').agg({
-                'Sales': 'sum',
-                'Profit': 'sum'
-            })
-            product_margin['Margin'] = (product_margin['Profit'] / product_margin['Sales']) * 100
-            top_margin = product_margin.nlargest(10, 'Margin')['Margin']
-            
-            fig = go.Figure(go.Bar(
-                x=top_margin.values,
-                y=top_margin.index,
-                orientation='h',
-                marker_color='gold',
-                text=top_margin.values,
-                texttemplate='%{text:.1f}%',
-                textposition='outside'
-            ))
-            fig.update_layout(height=400, showlegend=False, xaxis_title="Profit Margin (%)")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig_top_margin(sales_df, sales_sig), use_container_width=True)
         
         # Product Associations
         if associations_df is not None:
@@ -293,58 +591,45 @@ elif page == "Product Analytics":
             st.subheader("🛍️ Frequently Bought Together")
             st.markdown("*Products customers purchase in the same order*")
             
-            col1, col2, col3 = st.columns(3)
+            cols = st.columns(3)
+            bundles = associations_df.head(6)[['Product_1', 'Product_2', 'Frequency']]
             
-            for i in range(min(6, len(associations_df))):
-                with [col1, col2, col3][i % 3]:
-                    row = associations_df.iloc[i]
+            for i, row in enumerate(bundles.itertuples(index=False)):
+                with cols[i % 3]:
                     st.info(f"""
                     **Bundle #{i+1}**
                     
-                    {row['Product_1']} + {row['Product_2']}
+                    {row.Product_1} + {row.Product_2}
                     
-                    Purchased together: **{row['Frequency']} times**
+                    Purchased together: **{row.Frequency} times**
                     """)
 
 # ============================================================================
 # PAGE 4: CUSTOMER SEGMENTATION
 # ============================================================================
 
-elif page == "Customer Segmentation":
+def render_segmentation():
     st.header("Customer Segmentation (RFM Analysis)")
+    rfm_sig = data_signature(RFM_CSV)
+    rfm_df = load_rfm(rfm_sig)
     
     if rfm_df is not None:
         # Segment Overview
         st.subheader("Customer Segments Overview")
         
-        segment_stats = rfm_df.groupby('Segment').agg({
-            'Customer_ID': 'count',
-            'Monetary': ['sum', 'mean'],
-            'Frequency': 'mean',
-            'Recency': 'mean'
-        }).round(2)
+        segment_stats = agg_segment_stats(rfm_df, rfm_sig)
         
         col1, col2, col3, col4 = st.columns(4)
         
-        segments = ['Champions', 'Loyal', 'Potential', 'At Risk']
-        colors = ['#2ecc71', '#3498db', '#f39c12', '#e74c3c']
-        
-        for i, segment in enumerate(segments):
+        for i, segment in enumerate(SEGMENTS):
             if segment in segment_stats.index:
                 count = segment_stats.loc[segment, ('Customer_ID', 'count')]
                 revenue = segment_stats.loc[segment, ('Monetary', 'sum')]
                 
                 with [col1, col2, col3, col4][i]:
-                    st.markdown(f"""
-                    <div style='padding: 1rem; background-color: {colors[i]}22; 
-                                border-radius: 0.5rem; border-left: 4px solid {colors[i]}'>
-                        <h3 style='color: {colors[i]}; margin: 0;'>{segment}</h3>
-                        <p style='font-size: 2rem; margin: 0.5rem 0;'>{count}</p>
-                        <p style='margin: 0;'>customers</p>
-                        <p style='font-size: 1.2rem; margin: 0.5rem 0;'>${revenue:,.0f}</p>
-                        <p style='margin: 0;'>total revenue</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(SEGMENT_CARD.format(color=SEGMENT_COLORS[i], segment=segment,
+                                                    count=count, revenue=revenue),
+                                unsafe_allow_html=True)
         
         st.markdown("---")
         
@@ -353,69 +638,36 @@ elif page == "Customer Segmentation":
         
         with col1:
             st.subheader("Customer Distribution")
-            segment_counts = rfm_df['Segment'].value_counts()
-            
-            fig = go.Figure(go.Pie(
-                labels=segment_counts.index,
-                values=segment_counts.values,
-                marker_colors=colors[:len(segment_counts)]
-            ))
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig_segment_distribution(rfm_df, rfm_sig), use_container_width=True)
         
         with col2:
             st.subheader("Revenue by Segment")
-            segment_revenue = rfm_df.groupby('Segment')['Monetary'].sum().sort_values()
-            
-            fig = go.Figure(go.Bar(
-                x=segment_revenue.values,
-                y=segment_revenue.index,
-                orientation='h',
-                marker_color=colors[:len(segment_revenue)],
-                text=segment_revenue.values,
-                texttemplate='$%{text:,.0f}',
-                textposition='outside'
-            ))
-            fig.update_layout(height=400, showlegend=False, xaxis_title="Revenue ($)")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig_segment_revenue(rfm_df, rfm_sig), use_container_width=True)
         
         # RFM Scatter
         st.subheader("Customer Value Matrix")
-        fig = go.Figure()
-        
-        for segment in segments:
-            if segment in rfm_df['Segment'].values:
-                seg_data = rfm_df[rfm_df['Segment'] == segment]
-                fig.add_trace(go.Scatter(
-                    x=seg_data['Frequency'],
-                    y=seg_data['Monetary'],
-                    mode='markers',
-                    name=segment,
-                    marker=dict(size=8, opacity=0.6)
-                ))
-        
-        fig.update_layout(
-            height=500,
-            xaxis_title="Purchase Frequency",
-            yaxis_title="Total Spend ($)",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_value_matrix(rfm_df, rfm_sig), use_container_width=True)
 
 # ============================================================================
 # PAGE 5: RECOMMENDATIONS
 # ============================================================================
 
-elif page == "Recommendations":
+def render_recommendations():
     st.header("Business Recommendations")
+    rfm_sig = data_signature(RFM_CSV)
+    rfm_df = load_rfm(rfm_sig)
+    associations_df = load_associations(data_signature(ASSOCIATIONS_CSV))
+    forecast_sig = data_signature(FORECAST_CSV)
+    forecast_df = load_forecast(forecast_sig)
     
     if sales_df is not None:
         st.markdown("### 🎯 Key Strategic Recommendations")
+        summary = summary_metrics(sales_df, rfm_df, sales_sig, rfm_sig)
         
         # Forecast-based
         if forecast_df is not None:
-            avg_forecast = forecast_df['Forecasted_Sales'].mean()
-            last_actual = sales_df.groupby(sales_df['Order_Date'].dt.to_period('M'))['Sales'].sum().iloc[-1]
+            avg_forecast = agg_forecast_mean(forecast_df, forecast_sig)
+            last_actual = summary['last_month_sales']
             growth = ((avg_forecast - last_actual) / last_actual) * 100
             
             st.success(f"""
@@ -436,8 +688,8 @@ elif page == "Recommendations":
         
         # Customer segments
         if rfm_df is not None:
-            champions = len(rfm_df[rfm_df['Segment'] == 'Champions'])
-            at_risk = len(rfm_df[rfm_df['Segment'] == 'At Risk'])
+            champions = summary['seg_counts'].get('Champions', 0)
+            at_risk = summary['seg_counts'].get('At Risk', 0)
             
             st.warning(f"""
             **👥 Customer Retention Strategy**
@@ -447,32 +699,33 @@ elif page == "Recommendations":
             """)
         
         # Seasonal
-        sales_df['Month'] = sales_df['Order_Date'].dt.month_name()
-        monthly_avg = sales_df.groupby('Month')['Sales'].mean()
-        best_month = monthly_avg.idxmax()
-        worst_month = monthly_avg.idxmin()
-        
         st.info(f"""
         **📅 Seasonal Marketing Strategy**
-        - Peak month: **{best_month}** - Maximize marketing spend
-        - Low month: **{worst_month}** - Run clearance promotions
+        - Peak month: **{summary['best_month']}** - Maximize marketing spend
+        - Low month: **{summary['worst_month']}** - Run clearance promotions
         - Recommendation: Adjust inventory levels seasonally to reduce holding costs by 10%
         """)
         
         # Category optimization
-        category_margin = sales_df.groupby('Category').agg({
-            'Sales': 'sum',
-            'Profit': 'sum'
-        })
-        category_margin['Margin'] = (category_margin['Profit'] / category_margin['Sales']) * 100
-        best_margin_cat = category_margin['Margin'].idxmax()
-        
         st.success(f"""
         **📊 Category Optimization**
-        - Highest margin category: **{best_margin_cat}** ({category_margin.loc[best_margin_cat, 'Margin']:.1f}%)
+        - Highest margin category: **{summary['best_margin_cat']}** ({summary['best_margin']:.1f}%)
         - Recommendation: Increase shelf space and promotions for high-margin categories
         """)
 
+# ============================================================================
+# PAGE ROUTING
+# ============================================================================
+
+PAGES = {
+    "Executive Overview": render_executive,
+    "Sales Trends & Forecast": render_trends,
+    "Product Analytics": render_products,
+    "Customer Segmentation": render_segmentation,
+    "Recommendations": render_recommendations
+}
+PAGES[page]()
+
 st.markdown("---")
 st.markdown("<div style='text-align: center; color: #7f8c8d;'><p>Retail Sales Analytics Platform | Data-Driven Business Intelligence</p></div>", 
             unsafe_allow_html=True)
\ No newline at end of file